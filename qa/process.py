@@ -6,18 +6,152 @@ import io
 import sys
 import glob
 import time
+import mmap
 import shutil
+import fnmatch
+import contextlib
+import functools
+import concurrent.futures
 import pandas as pd
 import numpy as np
-from itertools import combinations
-from collections import OrderedDict
-from typing import List, Tuple
-from biopandas.pdb import PandasPdb
+from itertools import combinations, compress, islice, repeat
+from typing import Dict, List, Tuple
 from Bio.PDB import PDBParser, Vector
 import qa.reference
 from typing import List
 
+_FRAME_RE = re.compile(rb"frame\s+(\d+)")  # Frame number in an xyz title line
+_NUM_RE = re.compile(r"(\d+)")  # First integer in a file name
+_RES_RE = re.compile(r"([A-Za-z]{3}|[A-Za-z])(\d+)")  # Residue e.g., Ala1 or A1
+_HEADER_RE = re.compile(rb"\s*(?:\d+\s+)?[A-Za-z]")  # Charge header e.g., 0 N or Atom
 
+# One and three letter amino acid codes for validating residue names
+_AA_ONE = frozenset(codes[0] for codes in qa.reference.get_aa_identifiers().values())
+_AA_THREE = frozenset(codes[1] for codes in qa.reference.get_aa_identifiers().values())
+
+
+def _iter_files(pattern, root="."):
+    """
+    Lazily finds the paths below root whose name matches a pattern.
+
+    The tree is walked depth first with os.scandir and the entries of each
+    directory are visited in name order, descending into a directory as soon
+    as it is reached, e.g. ./a/b/template.pdb comes before ./a/template.pdb.
+    The walk stops as soon as the caller stops iterating.
+    Hidden entries and directories that cannot be read are skipped to match
+    the behavior of glob, and symlinked directories are not followed.
+
+    Parameters
+    ----------
+    pattern : str
+        A shell-style pattern for the file or directory name, e.g. *.xyz
+    root : str
+        The directory to search from.
+
+    Yields
+    ------
+    path : str
+        The path of the next match.
+
+    """
+
+    def sorted_entries(path):
+        # Unreadable or vanished directories are skipped like glob does
+        try:
+            with os.scandir(path) as directory:
+                entries = [entry for entry in directory if not entry.name.startswith(".")]
+        except OSError:
+            return iter(())
+        return iter(sorted(entries, key=lambda entry: entry.name))
+
+    stack = [sorted_entries(root)]
+    while stack:
+        entry = next(stack[-1], None)
+        if entry is None:
+            stack.pop()  # This directory is finished
+            continue
+        if fnmatch.fnmatchcase(entry.name, pattern):
+            yield entry.path
+        if entry.is_dir() and not entry.is_symlink():
+            stack.append(sorted_entries(entry.path))
+
+
+def _find_files(pattern, root=".") -> List[str]:
+    """
+    Recursively finds all paths below root whose name matches a pattern.
+
+    Parameters
+    ----------
+    pattern : str
+        A shell-style pattern for the file or directory name, e.g. *.xyz
+    root : str
+        The directory to search from.
+
+    Returns
+    -------
+    paths : List[str]
+        The paths of the matches in the order of _iter_files().
+
+    """
+    return list(_iter_files(pattern, root))
+
+
+def _list_replicates(ignore=()) -> List[str]:
+    """
+    Lists the replicate directories in the current directory.
+
+    Equivalent to sorted(glob.glob("*/")) without the trailing slashes,
+    but the directory check comes from os.scandir instead of a stat per entry.
+
+    Parameters
+    ----------
+    ignore : Iterable[str]
+        Directory names that are not replicates, e.g. Analysis
+
+    Returns
+    -------
+    replicates : List[str]
+        The sorted names of the replicate directories.
+
+    """
+    ignore = {name.rstrip("/") for name in ignore}
+    with os.scandir(".") as directory:
+        replicates = [
+            entry.name
+            for entry in directory
+            if not entry.name.startswith(".")
+            and entry.name not in ignore
+            and entry.is_dir()
+        ]
+    replicates.sort()
+
+    return replicates
+
+
+def _cache_per_directory(function):
+    """
+    Memoizes a file lookup for each working directory.
+
+    The modification time of the working directory is part of the key,
+    so adding or removing files there runs the lookup again.
+    Use function.cache_clear() after changing files in subdirectories.
+
+    """
+    cache = {}
+
+    @functools.wraps(function)
+    def wrapper():
+        key = (os.getcwd(), os.stat(".").st_mtime_ns)
+        if key not in cache:
+            cache[key] = function()
+        return cache[key]
+
+    wrapper.cache_clear = cache.clear
+
+    return wrapper
+
+
+@_cache_per_directory
 def get_pdb() -> str:
     """
     Searches all directories recursively for a PDB file.
@@ -37,26 +171,30 @@ def get_pdb() -> str:
     In the future, this function should check the contents to confirm.
 
     """
-    # A list of all PDB's found after recursive search
-    pdb_files = sorted(glob.glob("./**/template.pdb", recursive=True))
-    for index, pdb in enumerate(pdb_files):
+    # Search until a usable PDB is found and we know if there are others
+    pdb_file = None
+    pdb_count = 0
+    for pdb in _iter_files("template.pdb"):
+        pdb_count += 1
         # Trajectory PDB's should be marked as ensemble or traj
-        if "ensemble" in pdb or "traj" in pdb or "top" in pdb:
-            continue
-        else:
-            pdb_file = pdb_files[index]
+        is_trajectory = "ensemble" in pdb or "traj" in pdb or "top" in pdb
+        if pdb_file is None and not is_trajectory:
+            pdb_file = pdb
+        if pdb_file is not None and pdb_count > 1:
+            break
 
     # Multiple or no PDB files found scenarios
-    if len(pdb_files) == 1:
+    if pdb_file is None:
+        pdb_file = input("No PDB files was found. What is the path to your PDB file? ")
+    elif pdb_count == 1:
         print(f"> Using {pdb_file} as the template PDB.")
-    elif len(pdb_files) > 1:
-        print(f"> More than one PDB file found -> Using {pdb_file}.")
     else:
-        pdb_file = input("No PDB files was found. What is the path to your PDB file? ")
+        print(f"> More than one PDB file found -> Using {pdb_file}.")
 
     return pdb_file
 
 
+@_cache_per_directory
 def get_xyz() -> str:
     """
     Searches all directories for a XYZ file.
@@ -70,8 +208,8 @@ def get_xyz() -> str:
         The path of a XYZ file within the current directory.
 
     """
-    # Search recursively for an xyz file
-    xyz_names = glob.glob("./**/*.xyz", recursive=True)
+    # Search recursively for an xyz file, stopping once a second one is found
+    xyz_names = list(islice(_iter_files("*.xyz"), 2))
 
     # Check the results to confirm that there was only one xyz file found
     if len(xyz_names) == 1:
@@ -97,12 +235,97 @@ def get_atom_count() -> int:
     """
     # Find an xyz file
     xyz_name = get_xyz()
-    with open(xyz_name, "r") as xyz_file:
-        atom_count = int(xyz_file.readline().strip())
+    atom_count = _read_atom_count(*_file_key(xyz_name))
 
     return atom_count
 
 
+@functools.lru_cache(maxsize=16)
+def _read_atom_count(xyz_name, mtime, size) -> int:
+    """
+    Reads the number of atoms from the first line of an xyz file.
+
+    The modification time and size only serve as the cache key.
+
+    """
+    # Only the first line is needed, so read a small block without buffering
+    with open(xyz_name, "rb", buffering=0) as xyz_file:
+        head = xyz_file.read(32)
+        # Padded atom count lines may be longer than the block
+        if b"\n" not in head:
+            head += xyz_file.readline()
+
+    return int(head.split(b"\n", 1)[0])
+
+
+def _append_file(file_name, outfile) -> None:
+    """
+    Appends the contents of a file to an open binary file.
+
+    The copy is done in the kernel with os.sendfile when it is available,
+    otherwise the file is streamed through large buffers.
+
+    Parameters
+    ----------
+    file_name: str
+        The path of the file to copy.
+    outfile: BufferedWriter
+        The destination file opened in binary mode.
+
+    """
+    outfile.flush()  # Anything buffered must land before the kernel copy
+    with open(file_name, "rb") as infile:
+        offset = 0
+        try:
+            while True:
+                sent = os.sendfile(outfile.fileno(), infile.fileno(), offset, 1 << 24)
+                if sent == 0:
+                    break
+                offset += sent
+        except (AttributeError, OSError):
+            # No sendfile on this platform or file system
+            infile.seek(offset)
+            shutil.copyfileobj(infile, outfile, 8 * 1024 * 1024)
+
+
+def _send_range(infile, outfile, start, end) -> None:
+    """
+    Appends a byte range of an open file to an open binary file.
+
+    Like _append_file, the copy stays in the kernel when os.sendfile is available.
+    The source is passed open so a loop over many ranges only opens it once.
+
+    Parameters
+    ----------
+    infile: BufferedReader
+        The source file opened in binary mode.
+    outfile: BufferedWriter
+        The destination file opened in binary mode.
+    start: int
+        The offset of the first byte to copy.
+    end: int
+        The offset after the last byte to copy.
+
+    """
+    outfile.flush()  # Anything buffered must land before the kernel copy
+    offset, end = int(start), int(end)
+    try:
+        while offset < end:
+            sent = os.sendfile(outfile.fileno(), infile.fileno(), offset, end - offset)
+            if sent == 0:
+                break
+            offset += sent
+    except (AttributeError, OSError):
+        # No sendfile on this platform or file system
+        infile.seek(offset)
+        while offset < end:
+            chunk = infile.read(min(end - offset, 8 * 1024 * 1024))
+            if not chunk:
+                break
+            outfile.write(chunk)
+            offset += len(chunk)
+
+
 def combine_xyzs() -> None:
     """
     Combine an arbitrary number of xyz files.
@@ -113,10 +336,79 @@ def combine_xyzs() -> None:
 
     """
     xyz_files = glob.glob("*.xyz")
-    with open("all_coors.xyz", "w") as all_coors:
+    with open("all_coors.xyz", "wb") as all_coors:
         for xyz in xyz_files:
-            with open(xyz, "r") as current_xyz:
-                all_coors.write(current_xyz.read())
+            _append_file(xyz, all_coors)
+
+
+def _file_key(path) -> Tuple[str, int, int]:
+    """
+    Builds a cache key for a file from a single stat call.
+
+    The modification time and size are both part of the key,
+    so a file that is rewritten within the timestamp resolution is still reloaded.
+
+    Returns
+    -------
+    key : Tuple[str, int, int]
+        The path, modification time in nanoseconds, and size in bytes.
+
+    """
+    stat = os.stat(path)
+
+    return path, stat.st_mtime_ns, stat.st_size
+
+
+@functools.lru_cache(maxsize=8)
+def _load_pdb_atoms(pdb_path, mtime, size) -> Dict[str, np.ndarray]:
+    """
+    Reads the atom and residue columns of the ATOM records in a PDB once.
+
+    The records have fixed columns,
+    so the fields are sliced out of the raw bytes for all atoms at once.
+    The modification time and size are part of the cache key,
+    so an edited template will be parsed again.
+
+    Parameters
+    ----------
+    pdb_path : str
+        The path of the PDB file.
+    mtime : int
+        The modification time of the PDB file in nanoseconds.
+    size : int
+        The size of the PDB file in bytes.
+
+    Returns
+    -------
+    atoms : Dict[str, np.ndarray]
+        The atom_name, residue_name, and residue_number of each ATOM record.
+        The position in the arrays is the atom index.
+        Treat the arrays as read-only.
+
+    """
+    with open(pdb_path, "rb") as pdb_file:
+        with mmap.mmap(pdb_file.fileno(), 0, access=mmap.ACCESS_READ) as pdb_mm:
+            offsets = _line_offsets(pdb_mm)
+            buffer = np.frombuffer(pdb_mm, dtype=np.uint8)
+
+            # Keep the lines long enough to hold a residue number
+            starts = offsets[:-1][np.diff(offsets) >= 26]
+            record = buffer[starts[:, None] + np.arange(6)].view("S6").ravel()
+            starts = starts[record == b"ATOM  "]
+
+            # Slice the fixed columns of every ATOM record
+            atom_name = buffer[starts[:, None] + np.arange(12, 16)].view("S4").ravel()
+            residue_name = buffer[starts[:, None] + np.arange(17, 20)].view("S3").ravel()
+            residue_number = buffer[starts[:, None] + np.arange(22, 26)].view("S4").ravel()
+            del buffer  # Release the view so the map can close
+
+    atoms = {
+        "atom_name": np.char.strip(atom_name).astype(str),
+        "residue_name": np.char.strip(residue_name).astype(str),
+        "residue_number": residue_number.astype(np.int64),
+    }
+
+    return atoms
 
 
 def get_protein_sequence(pdb_path) -> List[str]:
@@ -129,20 +421,26 @@ def get_protein_sequence(pdb_path) -> List[str]:
 
     """
 
-    # Get the template file and load it as a pandas dataframe
-    pdb_df = PandasPdb().read_pdb(pdb_path).df["ATOM"]
+    # Get the residue columns of the template
+    atoms = _load_pdb_atoms(*_file_key(pdb_path))
+    residue_numbers = atoms["residue_number"]
 
-    # Filter the dataframe so there is one entry for each residue
-    residues_df = pdb_df[["residue_name", "residue_number"]]
-    residues_df = residues_df.drop_duplicates(subset=["residue_number"], keep="first")
-
-    # Convert it to a list of amino acids
-    residues_df = residues_df["residue_name"]
-    residues_list = residues_df.values.tolist()
+    # Residue numbers increase down the file, so a residue starts where they change
+    if np.all(np.diff(residue_numbers) >= 0):
+        first_atoms = np.flatnonzero(
+            np.diff(residue_numbers, prepend=residue_numbers[:1] - 1)
+        )
+        residues_list = atoms["residue_name"][first_atoms].tolist()
+    else:
+        # Keep one entry for each residue number
+        residues_df = pd.DataFrame(atoms)
+        residues_df = residues_df.drop_duplicates(subset=["residue_number"], keep="first")
+        residues_list = residues_df["residue_name"].values.tolist()
 
     return residues_list
 
 
+@_cache_per_directory
 def get_charge_file() -> str:
     """
     Searches all directories for a charge xls file.
@@ -177,6 +475,39 @@ def get_charge_file() -> str:
 
     return charge_file
 
+def _read_replicate_structures(replicate) -> Tuple[int, bytes]:
+    """
+    Reads the single point xyz files of one replicate in order.
+
+    Parameters
+    ----------
+    replicate: str
+        The replicate directory, e.g. 1/
+
+    Returns
+    -------
+    frame_count : int
+        The number of xyz files that were read.
+    structures : bytes
+        The contents of all the xyz files joined together.
+
+    """
+    # Order the structures by the first integer in their names
+    structures = glob.glob(os.path.join(replicate, "coordinates", "*.xyz"))
+    keys = np.fromiter(
+        (int(_NUM_RE.search(os.path.basename(x)).group(1)) for x in structures),
+        dtype=np.int64,
+        count=len(structures),
+    )
+    structures = [structures[i] for i in np.argsort(keys, kind="stable")]
+    contents = []
+    for structure in structures:
+        with open(structure, "rb") as file:
+            contents.append(file.read())
+
+    return len(contents), b"".join(contents)
+
+
 def combine_sp_xyz():
     """
     Combines single point xyz's for all replicates.
@@ -194,7 +525,6 @@ def combine_sp_xyz():
     start_time = time.time()  # Used to report the executation speed
 
     # Get the directories of each replicate
-    primary = os.getcwd()
     replicates = sorted(glob.glob("*/"))
     ignore = ["Analyze/", "Analysis/", "coordinates/", "inputfiles/", "opt-wfn/"]
 
@@ -205,28 +535,19 @@ def combine_sp_xyz():
     geometry_name = os.getcwd().split("/")[-1]
     out_file = f"{geometry_name}_geometry.xyz"
 
-    with open(out_file, "w") as combined_sp:
-        for replicate in replicates:
-            if replicate in ignore:
-                continue
-            else:
-                print(f"   > Adding replicate {replicate} structures.")
-                os.chdir(replicate)
-                os.chdir("coordinates")
-
-                structures = sorted(glob.glob("*.xyz"), key=lambda x: int(re.findall(r'\d+', x)[0]))
-                frame_count = 0  # Initialize frame count for each replicate
-                for index, structure in enumerate(structures):
-                    with open(structure, "r") as file:
-                        # Write the header from the first file
-                        combined_sp.writelines(file.readlines())
-                        xyz_count += 1
-                        frame_count += 1
-
-                replicate_info.append((int(replicate[:-1]), frame_count))  # Append replicate information
+    # Replicates are independent so read them in parallel
+    replicates = [replicate for replicate in replicates if replicate not in ignore]
+    for replicate in replicates:
+        print(f"   > Adding replicate {replicate} structures.")
+    with concurrent.futures.ProcessPoolExecutor() as executor:
+        results = executor.map(_read_replicate_structures, replicates)
 
-            # Go back and loop through all the other replicates
-            os.chdir(primary)
+        # Write the structures in replicate order as they are returned
+        with open(out_file, "wb") as combined_sp:
+            for replicate, (frame_count, structures) in zip(replicates, results):
+                combined_sp.write(structures)
+                xyz_count += frame_count
+                replicate_info.append((int(replicate[:-1]), frame_count))
 
     total_time = round(time.time() - start_time, 3)  # Time to run the function
     print(
@@ -249,6 +570,30 @@ import glob
 import time
 
 
+def _line_offsets(buffer) -> np.ndarray:
+    """
+    Finds the byte offset where each line of a buffer starts.
+
+    Parameters
+    ----------
+    buffer : mmap.mmap or bytes
+        The contents of a text file.
+
+    Returns
+    -------
+    offsets : np.ndarray
+        The start of every line followed by the end of the buffer,
+        so line i is buffer[offsets[i] : offsets[i + 1]].
+
+    """
+    newlines = np.flatnonzero(np.frombuffer(buffer, dtype=np.uint8) == 0x0A)
+    offsets = np.r_[0, newlines + 1]
+    if offsets[-1] != len(buffer):
+        offsets = np.r_[offsets, len(buffer)]
+
+    return offsets
+
+
 def combine_restarts(
     atom_count, all_charges: str = "all_charges.xls", all_coors: str = "all_coors.xyz"
 ) -> None:
@@ -274,97 +619,109 @@ def combine_restarts(
     start_time = time.time()  # Clock execution speed
 
     # Locate all directories containing coordinate and charge files
-    directories = sorted(glob.glob("./**/scr*", recursive=True))
+    directories = _find_files("scr*")
 
     if not directories:
         print("No directories found matching the pattern './**/scr*'. Exiting.")
         return
 
-    # Delete existing combined files if they exist
-    if os.path.exists(all_charges):
-        os.remove(all_charges)
-    if os.path.exists(all_coors):
-        os.remove(all_coors)
-
     # Variables to keep track of the last processed frame
     last_frame = 0
     total_frames = 0
+    header_written = False
 
-    # Process each directory
-    for dir_idx, directory in enumerate(directories):
-        coors_file_path = os.path.join(directory, "coors.xyz")
-        charge_file_path = os.path.join(directory, "charge.xls")
+    # Open the combined files once, replacing any existing versions
+    with open(all_coors, "wb") as all_coors_file, open(all_charges, "wb") as all_charges_file:
+        # Process each directory
+        for directory in directories:
+            coors_file_path = os.path.join(directory, "coors.xyz")
+            charge_file_path = os.path.join(directory, "charge.xls")
 
-        if not os.path.exists(coors_file_path) or not os.path.exists(charge_file_path):
-            print(f"Skipping {directory}: Missing coors.xyz or charge.xls.")
-            continue
-
-        # Read coordinate and charge files
-        with open(coors_file_path, "r") as coors_file:
-            coors_lines = coors_file.readlines()
-
-        with open(charge_file_path, "r") as charge_file:
-            charge_lines = charge_file.readlines()
-
-        # Determine the number of atoms per frame
-        lines_per_frame = atom_count + 2
-
-        # Extract frame numbers and their indices from the title lines
-        frame_numbers = []
-        frame_indices = []
-        for i in range(1, len(coors_lines), lines_per_frame):
-            title_line = coors_lines[i]
-            try:
-                frame_number = int(title_line.split()[2])  # Extract frame number
-                frame_numbers.append(frame_number)
-                frame_indices.append(i - 1)  # Index of the atom count line
-            except (IndexError, ValueError):
-                print(f"Warning: Could not parse frame number from line: {title_line.strip()}")
-
-        # Identify the starting frame of this run and exclude overlaps
-        valid_start_idx = 0
-        for idx, frame in enumerate(frame_numbers):
-            if frame > last_frame:
-                valid_start_idx = idx
-                break
-
-        # Update the last processed frame
-        if frame_numbers:
-            last_frame = frame_numbers[-1]
-
-        # Write the valid frames and charges to the combined files
-        with open(all_coors, "a") as all_coors_file:
-            for idx in range(valid_start_idx, len(frame_numbers)):
-                start = frame_indices[idx]
-                end = start + lines_per_frame
-                all_coors_file.writelines(coors_lines[start:end])
-
-        with open(all_charges, "a") as all_charges_file:
-            if dir_idx == 0:
-                # Include header line only once
-                all_charges_file.write(charge_lines[0])
-            all_charges_file.writelines(charge_lines[valid_start_idx + 1 : len(frame_numbers) + 1])
-
-        # Update the total number of frames
-        total_frames += len(frame_numbers) - valid_start_idx
-
-        print(
-            f"Processed {directory}: Added frames {frame_numbers[valid_start_idx]} "
-            f"to {frame_numbers[-1]} ({len(frame_numbers) - valid_start_idx} frames)."
-        )
+            if not os.path.exists(coors_file_path) or not os.path.exists(charge_file_path):
+                print(f"Skipping {directory}: Missing coors.xyz or charge.xls.")
+                continue
+            if os.path.getsize(coors_file_path) == 0 or os.path.getsize(charge_file_path) == 0:
+                print(f"Skipping {directory}: Empty coors.xyz or charge.xls.")
+                continue
 
-    # Validate the combined files
-    combined_frame_count = 0
-    with open(all_coors, "r") as coors:
-        for line in coors:
-            if "frame" in line:
-                combined_frame_count += 1
+            # Open each run file once, then map it instead of reading it into lists
+            with contextlib.ExitStack() as stack:
+                coors_file = stack.enter_context(open(coors_file_path, "rb"))
+                charge_file = stack.enter_context(open(charge_file_path, "rb"))
+                coors_mm = stack.enter_context(
+                    mmap.mmap(coors_file.fileno(), 0, access=mmap.ACCESS_READ)
+                )
+                charge_mm = stack.enter_context(
+                    mmap.mmap(charge_file.fileno(), 0, access=mmap.ACCESS_READ)
+                )
+                coors_offsets = _line_offsets(coors_mm)
+                charge_offsets = _line_offsets(charge_mm)
+                coors_line_count = len(coors_offsets) - 1
+                charge_line_count = len(charge_offsets) - 1
+
+                # Determine the number of atoms per frame
+                lines_per_frame = atom_count + 2
+
+                # Extract frame numbers from the title lines in a single regex pass
+                title_indices = np.arange(1, coors_line_count, lines_per_frame)
+                frame_numbers = np.array(_FRAME_RE.findall(coors_mm), dtype=np.int64)
+                frame_indices = title_indices - 1  # Index of the atom count line
+                if len(frame_numbers) != len(title_indices):
+                    # Fall back to parsing the title lines one at a time
+                    parsed_frames = []
+                    for i in title_indices:
+                        title_line = coors_mm[coors_offsets[i] : coors_offsets[i + 1]]
+                        try:
+                            frame_number = int(title_line.split()[2])  # Extract frame number
+                            parsed_frames.append((frame_number, i - 1))
+                        except (IndexError, ValueError):
+                            print(f"Warning: Could not parse frame number from line: {title_line.decode().strip()}")
+                    frame_numbers = np.array([frame for frame, _ in parsed_frames], dtype=np.int64)
+                    frame_indices = np.array([index for _, index in parsed_frames], dtype=np.int64)
+
+                # Identify the starting frame of this run and exclude overlaps
+                valid_start_idx = int(np.searchsorted(frame_numbers, last_frame, side="right"))
+
+                # Update the last processed frame
+                if len(frame_numbers):
+                    last_frame = int(frame_numbers[-1])
+
+                # Byte ranges of the valid frames, merged where they are contiguous
+                frame_starts = frame_indices[valid_start_idx:]
+                byte_starts = coors_offsets[frame_starts]
+                byte_ends = coors_offsets[np.minimum(frame_starts + lines_per_frame, coors_line_count)]
+                breaks = np.flatnonzero(byte_starts[1:] != byte_ends[:-1]) + 1
+                run_starts = byte_starts[np.r_[0, breaks]] if len(byte_starts) else byte_starts
+                run_ends = byte_ends[np.r_[breaks - 1, len(byte_ends) - 1]] if len(byte_ends) else byte_ends
+
+                # Copy the valid frames and charges straight from the run files
+                for run_start, run_end in zip(run_starts, run_ends):
+                    _send_range(coors_file, all_coors_file, run_start, run_end)
+
+                if not header_written:
+                    # Include header line only once
+                    _send_range(charge_file, all_charges_file, charge_offsets[0], charge_offsets[1])
+                    header_written = True
+                start = min(valid_start_idx + 1, charge_line_count)
+                end = min(len(frame_numbers) + 1, charge_line_count)
+                _send_range(charge_file, all_charges_file, charge_offsets[start], charge_offsets[end])
+
+            # Update the total number of frames
+            total_frames += len(frame_numbers) - valid_start_idx
+
+            if valid_start_idx < len(frame_numbers):
+                print(
+                    f"Processed {directory}: Added frames {frame_numbers[valid_start_idx]} "
+                    f"to {frame_numbers[-1]} ({len(frame_numbers) - valid_start_idx} frames)."
+                )
+            else:
+                print(f"Processed {directory}: No new frames.")
 
     total_time = round(time.time() - start_time, 3)  # Seconds to run
     print(
         f"""
         \t----------------------------ALL RUNS END----------------------------
-        \tRESULT: {combined_frame_count} frames and {total_frames} charges combined.
+        \tRESULT: {total_frames} frames and charges combined.
         \tOUTPUT: Generated {all_charges} and {all_coors}.
         \tTIME: Total execution time: {total_time} seconds.
         \t--------------------------------------------------------------------\n
@@ -411,33 +768,21 @@ def combine_replicates(
             charge_files.append(f"{dir}{files[0]}")
             coors_files.append(f"{dir}{files[1]}")
 
-    new_file_names = [f"raw_{all_charges}", all_coors]
-    file_locations = [charge_files, coors_files]
-    # Loop over the file names and their locations
-    for file_name, file_location in zip(new_file_names, file_locations):
-        # Open a new file where we will write the concatonated output
-        with open(file_name, "wb") as outfile:
-            for loc in file_location:
-                with open(loc, "rb") as infile:
-                    shutil.copyfileobj(infile, outfile)
-
-    # The combined charge file now has multiple header lines
-    first_line = True
-    with open(new_file_names[0], "r") as raw_charge_file:
-        with open(files[0], "w") as clean_charge_file:
-            for line in raw_charge_file:
-                # We want the first line to have the header
-                if first_line == True:
-                    clean_charge_file.write(line)
-                    first_line = False
-                # After the first, no lines should contain atom names
-                else:
-                    if "H" in line:
-                        continue
-                    else:
-                        clean_charge_file.write(line)
-    # Delete the charge file with the extra headers to keep the dir clean
-    os.remove(new_file_names[0])
+    # Stream the charges in a single pass, keeping only the first header
+    with open(files[0], "wb", buffering=1 << 20) as outfile:
+        for index, loc in enumerate(charge_files):
+            with open(loc, "rb") as infile:
+                # Skip the header line, but never a line of charges
+                body_start = 0
+                if index > 0 and _HEADER_RE.match(infile.readline()):
+                    body_start = infile.tell()
+                # Copy the rest of the file in the kernel
+                _send_range(infile, outfile, body_start, os.fstat(infile.fileno()).st_size)
+
+    # The coordinates need no filtering
+    with open(files[1], "wb", buffering=1 << 20) as outfile:
+        for loc in coors_files:
+            _append_file(loc, outfile)
 
     total_time = round(time.time() - start_time, 3)  # Seconds to run the function
     print(
@@ -552,13 +897,6 @@ def combine_replicates(
 #     all_coors_file.close()
 #     all_charges_file.close()
 
-#     # Check the number of frames in the combined xyz trajectory and print for user
-#     coors_frame_count = 0
-#     with open(all_coors, "r") as coors:
-#         for line in coors:
-#             if "frame" in line:
-#                 coors_frame_count += 1
-
 #     # Check number of charge frames and print for user
 #     charge_frame_count = -1
 #     with open(all_charges, "r") as charges:
@@ -569,7 +907,7 @@ def combine_replicates(
 #     print(
 #         f"""
 #         \t----------------------------ALL RUNS END----------------------------
-#         \tRESULT: {coors_frame_count} frames and {charge_frame_count} charges from {out_files_count} runs.
+#         \tRESULT: {charge_frame_count} frames and charges from {out_files_count} runs.
 #         \tOUTPUT: Generated {all_charges} and {all_coors}.
 #         \tOUTPUT: {os.path.abspath(os.getcwd())}.
 #         \tTIME: Total execution time: {total_time} seconds.
@@ -602,10 +940,31 @@ def summed_residue_charge(charge_data: pd.DataFrame, template: str):
 
     # Get the residue identifiers (e.g., 1Ala) for each atom
     residues_indentifier = get_residue_identifiers(template)
+    if charge_data.shape[1] != len(residues_indentifier):
+        raise ValueError(
+            f"> ERROR: Found {charge_data.shape[1]} charge columns "
+            f"but {len(residues_indentifier)} atoms in {template}."
+        )
 
-    # Assign the residue identifiers as the column names of the charge DataFrame
-    charge_data.columns = residues_indentifier
-    sum_by_residues = charge_data.groupby(by=charge_data.columns, sort=False, axis=1).sum()
+    # Atoms of the same residue are adjacent, so each residue is a contiguous run
+    residues_array = np.asarray(residues_indentifier)
+    starts = np.flatnonzero(
+        np.r_[True, residues_array[1:] != residues_array[:-1]]
+    )
+    unique_residues = residues_array[starts].tolist()
+
+    if len(set(unique_residues)) == len(unique_residues):
+        # Sum each run of columns in a single pass
+        charges = np.ascontiguousarray(charge_data.to_numpy(dtype=np.float64))
+        sum_by_residues = pd.DataFrame(
+            np.add.reduceat(charges, starts, axis=1),
+            index=charge_data.index,
+            columns=unique_residues,
+        )
+    else:
+        # Residues split across the PDB, fall back to grouping by name
+        charge_data.columns = residues_indentifier
+        sum_by_residues = charge_data.T.groupby(level=0, sort=False).sum().T
 
     # Add the "replicate" column back to the sum_by_residues DataFrame
     sum_by_residues['replicate'] = replicate_column
@@ -633,22 +992,131 @@ def get_residue_identifiers(template, by_atom=True) -> List[str]:
         A list of the residue identifiers
 
     """
-    # Get the residue number identifiers (e.g., 1)
-    residue_number = (
-        PandasPdb().read_pdb(template).df["ATOM"]["residue_number"].tolist()
+    # Parse the template once and pull both residue columns
+    atoms = _load_pdb_atoms(*_file_key(template))
+    # Combine the names (e.g., ALA) and numbers (e.g., 1) together
+    residues_indentifier = np.char.add(
+        atoms["residue_name"], atoms["residue_number"].astype(str)
     )
-    # Get the residue number identifiers (e.g., ALA)
-    residue_name = PandasPdb().read_pdb(template).df["ATOM"]["residue_name"].tolist()
-    # Combine them together
-    residues_indentifier = [
-        f"{name}{number}" for number, name in zip(residue_number, residue_name)
-    ]
 
     # Return only unique entries if the user sets by_atom = False
     if not by_atom:
-        residues_indentifier = list(OrderedDict.fromkeys(residues_indentifier))
+        residues_indentifier = pd.unique(residues_indentifier)
+
+    return residues_indentifier.tolist()
+
+
+def _read_xyz_coordinates(xyz_name, atom_count) -> np.ndarray:
+    """
+    Reads all frames of an xyz trajectory into a single array.
+
+    Parameters
+    ----------
+    xyz_name: str
+        The path of the xyz trajectory.
+    atom_count: int
+        The number of atoms in each frame.
+
+    Returns
+    -------
+    coordinates: np.ndarray
+        The coordinates with the shape (frames, atoms, 3).
+
+    """
+    with open(xyz_name, "r") as xyz_file:
+        lines = xyz_file.read().splitlines()
+
+    # Skip the atom count and title lines at the start of each frame
+    lines_per_frame = atom_count + 2
+    frame_count = len(lines) // lines_per_frame
+    if len(lines) % lines_per_frame and any(lines[frame_count * lines_per_frame :]):
+        print(f"   > Skipping an incomplete final frame in {xyz_name}.")
+
+    # Every frame must start with the atom count of the template
+    frame_atoms = lines[: frame_count * lines_per_frame : lines_per_frame]
+    if any(line.strip() != str(atom_count) for line in frame_atoms):
+        raise ValueError(
+            f"> ERROR: The frames in {xyz_name} do not all have {atom_count} atoms."
+        )
+
+    line_index = np.arange(frame_count * lines_per_frame)
+    atom_lines = compress(lines, line_index % lines_per_frame >= 2)
+    coordinates = np.loadtxt(atom_lines, usecols=(1, 2, 3), comments=None, ndmin=2)
+    if coordinates.shape[0] != frame_count * atom_count:
+        raise ValueError(f"> ERROR: Could not read the coordinates in {xyz_name}.")
+
+    return coordinates.reshape(frame_count, atom_count, 3)
+
+
+def _format_pdb_frame(frame_template, frame) -> str:
+    """
+    Writes one frame of coordinates into the template PDB records.
+
+    Parameters
+    ----------
+    frame_template: str
+        The format string for a whole frame from _load_pdb_template().
+    frame: np.ndarray
+        The coordinates of the frame with the shape (atoms, 3).
+
+    Returns
+    -------
+    block: str
+        The ATOM records of the frame.
+
+    """
+    # One format call fills every coordinate of the frame
+    return frame_template % tuple(frame.ravel().tolist())
+
+
+@functools.lru_cache(maxsize=4)
+def _load_pdb_template(pdb_name, mtime, size) -> Tuple[int, str]:
+    """
+    Turns the ATOM records of the template PDB into a format string for a frame.
+
+    Only the coordinates change between frames,
+    so columns 1-30 and 55-80 of every record are fixed in the format string once.
+    The result is cached on the path, modification time, and size,
+    so converting many xyz files reads the template once.
+
+    Parameters
+    ----------
+    pdb_name: str
+        The path of the template PDB.
+    mtime: int
+        The modification time of the template in nanoseconds.
+    size: int
+        The size of the template in bytes.
+
+    Returns
+    -------
+    max_atom: int
+        The number of atoms in the template.
+    frame_template: str
+        A format string for all ATOM records that takes x, y, and z of each atom.
+
+    """
+    with open(pdb_name, "rb") as template:
+        with mmap.mmap(template.fileno(), 0, access=mmap.ACCESS_READ) as pdb_mm:
+            # The last ATOM record is the third line from the end
+            line_start = pdb_mm.rfind(b"\n", 0, len(pdb_mm) - 1)
+            line_start = pdb_mm.rfind(b"\n", 0, line_start)
+            line_start = pdb_mm.rfind(b"\n", 0, line_start) + 1
+            line_end = pdb_mm.find(b"\n", line_start)
+            max_atom = int(pdb_mm[line_start:line_end].split()[1])
+
+            # Only decode the ATOM records
+            atom_end = _line_offsets(pdb_mm)[max_atom]
+            atom_lines = pdb_mm[:atom_end].decode().splitlines(keepends=True)
+
+    templates = []
+    for line in atom_lines:
+        # Escape any literal % so only the coordinates are substituted
+        prefix = line[0:30].replace("%", "%%")
+        suffix = line[54:80].rstrip("\n").replace("%", "%%")
+        templates.append(f"{prefix}%8.3f%8.3f%8.3f{suffix}\n")
 
-    return residues_indentifier
+    return max_atom, "".join(templates)
 
 
 def xyz2pdb(xyz_list: List[str]) -> None:
@@ -671,32 +1139,13 @@ def xyz2pdb(xyz_list: List[str]) -> None:
 
     # Search for the XYZ and PDB files names
     pdb_name = get_pdb()
-    pdb_file = open(pdb_name, "r").readlines()
-    max_atom = int(pdb_file[len(pdb_file) - 3].split()[1])
+    max_atom, frame_template = _load_pdb_template(*_file_key(pdb_name))
 
     for index, xyz in enumerate(xyz_list):
-        new_file = open(f"{index}.pdb", "w")
-        xyz_file = open(xyz, "r").readlines()
-        atom = -1  # Start at -1 to skip the XYZ header
-        line_count = 0
-        for line in xyz_file:
-            line_count += 1
-            if atom > 0:
-                atom += 1
-                try:
-                    x, y, z = line.strip("\n").split()[1:5]  # Coordinates from xyz file
-                except:
-                    print(f"> Script died at {line_count} -> '{line}'")
-                    quit()
-                pdb_line = pdb_file[atom - 2]  # PDB is two behind the xyz
-                new_file.write(
-                    f"{pdb_line[0:30]}{x[0:6]}  {y[0:6]}  {z[0:6]}  {pdb_line[54:80]}"
-                )
-            else:
-                atom += 1
-            if atom > max_atom:
-                atom = -1
-                new_file.write("END\n")
+        coordinates = _read_xyz_coordinates(xyz, max_atom)
+        with open(f"{index}.pdb", "wb", buffering=1 << 20) as new_file:
+            for frame in coordinates:
+                new_file.write(f"{_format_pdb_frame(frame_template, frame)}END\n".encode())
 
     total_time = round(time.time() - start_time, 3)  # Seconds to run the function
     print(
@@ -724,32 +1173,13 @@ def xyz2pdb_traj(xyz_name, pdb_name, pdb_template) -> None:
 
     start_time = time.time()  # Used to report the executation speed
 
-    # Open files for reading
-    xyz_file = open(xyz_name, "r").readlines()
-    pdb_file = open(pdb_template, "r").readlines()
-    max_atom = int(pdb_file[len(pdb_file) - 3].split()[1])
-    new_file = open(pdb_name, "w")
-
-    atom = -1  # Start at -1 to skip the XYZ header
-    line_count = 0
-    for line in xyz_file:
-        line_count += 1
-        if atom > 0:
-            atom += 1
-            try:
-                x, y, z = line.strip("\n").split()[1:5]  # Coordinates from xyz file
-            except:
-                print(f"> Script died at {line_count} -> '{line}'")
-                quit()
-            pdb_line = pdb_file[atom - 2]  # PDB is two behind the xyz
-            new_file.write(
-                f"{pdb_line[0:30]}{x[0:6]}  {y[0:6]}  {z[0:6]}  {pdb_line[54:80]}"
-            )
-        else:
-            atom += 1
-        if atom > max_atom:
-            atom = -1
-            new_file.write("END\n")
+    # Parse the template once and all coordinates in a single pass
+    max_atom, frame_template = _load_pdb_template(*_file_key(pdb_template))
+    coordinates = _read_xyz_coordinates(xyz_name, max_atom)
+
+    with open(pdb_name, "wb", buffering=1 << 20) as new_file:
+        for frame in coordinates:
+            new_file.write(f"{_format_pdb_frame(frame_template, frame)}END\n".encode())
 
     total_time = round(time.time() - start_time, 3)  # Seconds to run the function
     print(
@@ -780,33 +1210,19 @@ def xyz2pdb_ensemble() -> None:
     protein_name = pdb_name.split("/")[-1][:-4].upper()
     new_pdb_name = f"{protein_name}_ensemble.pdb"
 
-    # Open files for reading
-    xyz_file = open(xyz_name, "r").readlines()
-    pdb_file = open(pdb_name, "r").readlines()
-    max_atom = int(pdb_file[len(pdb_file) - 3].split()[1])
-    new_file = open(new_pdb_name, "w")
-
-    atom = -1  # Start at -1 to skip the XYZ header
-    model_number = 2
-    new_file.write(f"{protein_name}\n")  # PDB header line
-    new_file.write(f"MODEL        1\n")  # The first line will always be MODEL 1
-
-    for line in xyz_file:
-        if atom > 0:
-            atom += 1
-            x, y, z = line.strip("\n").split()[1:5]  # Coordinates from xyz file
-            pdb_line = pdb_file[atom - 2]  # PDB is two behind the xyz
-            new_file.write(
-                f"{pdb_line[0:30]}{x[0:6]}  {y[0:6]}  {z[0:6]}  {pdb_line[54:80]}\n"
-            )
-        else:
-            atom += 1
-        if atom > max_atom:
-            atom = -1
-            new_file.write("TER\n")
-            new_file.write("ENDMDL\n")
-            new_file.write(f"MODEL        {str(model_number)}\n")
-            model_number += 1
+    # Parse the template once and all coordinates in a single pass
+    max_atom, frame_template = _load_pdb_template(*_file_key(pdb_name))
+    coordinates = _read_xyz_coordinates(xyz_name, max_atom)
+
+    # Fold the model records into the frame template so each model is one format
+    model_template = f"MODEL        %d\n{frame_template}TER\nENDMDL\n"
+
+    # Each model is written with a single call into a 4 MiB buffer
+    with io.BufferedWriter(io.FileIO(new_pdb_name, "w"), 4 * 1024 * 1024) as new_file:
+        new_file.write(f"{protein_name}\n".encode("ascii"))  # PDB header line
+        for model_number, frame in enumerate(coordinates, start=1):
+            model = model_template % (model_number, *frame.ravel().tolist())
+            new_file.write(model.encode("ascii"))
 
     total_time = round(time.time() - start_time, 3)  # Seconds to run the function
     print(
@@ -832,34 +1248,51 @@ def clean_incomplete_xyz() -> None:
     start_time = time.time()  # Used to report the executation speed
     orig_file = "all_coors.xyz"
     new_file = "all_coors_clean.xyz"
-    incomplete = 0  # Only used to create user status report at end
-
-    with open(new_file, "w") as coors_file_new:
-        with open(orig_file, "r") as coors_file:
-            section_delim = coors_file.readline().strip()  # First line
-            section = []  # Stores the lines for each section
-            first_line = True  # The first line is a unique case
-
-            for line in coors_file:
-                # Write out the first line no matter what
-                if first_line:
-                    section.append(line)
-                    first_line = False
-                else:
-                    # Reached the end of a section?
-                    if line[: len(section_delim)] == section_delim:
-                        # Check if the section has all the atoms it should
-                        if len(section) == int(section_delim) + 2:
-                            # Write the section out to the new file if complete
-                            for line in section:
-                                coors_file_new.write(line)
-                        else:
-                            incomplete += 1
-                        # Start a new section
-                        section = []
-                        section.append(line)
-                    else:
-                        section.append(line)
+
+    # An empty trajectory has no sections and cannot be mapped
+    if os.path.getsize(orig_file) == 0:
+        byte_starts = byte_ends = []
+        incomplete = 0
+    else:
+        # Index every line of the mapped file at once instead of looping over lines
+        with open(orig_file, "rb") as coors_file:
+            with mmap.mmap(coors_file.fileno(), 0, access=mmap.ACCESS_READ) as coors_mm:
+                buffer = np.frombuffer(coors_mm, dtype=np.uint8)
+                offsets = _line_offsets(coors_mm)
+                line_starts = offsets[:-1]
+                line_lengths = np.diff(offsets)
+
+                # The atom count starts each section
+                section_delim = coors_mm[: offsets[1]].strip()
+                expected = int(section_delim) + 2  # Lines in a complete section
+
+                # Lines whose first token is the delimiter start a new section
+                is_delim = line_lengths >= len(section_delim)
+                for index, byte in enumerate(section_delim):
+                    candidates = np.flatnonzero(is_delim)
+                    is_delim[candidates] = buffer[line_starts[candidates] + index] == byte
+                # The delimiter must not just be the start of a longer number
+                candidates = np.flatnonzero(is_delim & (line_lengths > len(section_delim)))
+                next_bytes = buffer[line_starts[candidates] + len(section_delim)]
+                is_delim[candidates] = np.isin(next_bytes, list(b" \t\r\n"))
+                is_delim[0] = True  # The first line always starts a section
+                del buffer  # Release the view so the map can be closed
+                section_starts = np.flatnonzero(is_delim)
+                section_ends = np.r_[section_starts[1:], len(line_starts)]
+
+                # Complete sections have exactly the expected number of lines
+                complete = (section_ends - section_starts) == expected
+                incomplete = int(np.count_nonzero(~complete))
+
+        # Neighboring complete sections are copied as a single byte range
+        run_starts = complete & ~np.r_[False, complete[:-1]]
+        run_ends = complete & ~np.r_[complete[1:], False]
+        byte_starts = offsets[section_starts[run_starts]]
+        byte_ends = offsets[section_ends[run_ends]]
+
+    with open(orig_file, "rb") as coors_file, open(new_file, "wb") as coors_file_new:
+        for byte_start, byte_end in zip(byte_starts, byte_ends):
+            _send_range(coors_file, coors_file_new, byte_start, byte_end)
 
     total_time = round(time.time() - start_time, 3)  # Seconds to run the function
     print(
@@ -878,7 +1311,7 @@ def check_valid_resname(res) -> Tuple[str, int]:
     Checks if a valid resname has been identified.
 
     Excepts a resname of the form e.g. Ala1, A1, Gly12, G12.
-    If an incorrect resname is supplied the fuction will exit with an warning.
+    If an incorrect resname is supplied the fuction will raise a ValueError.
 
     Parameters
     ----------
@@ -893,19 +1326,26 @@ def check_valid_resname(res) -> Tuple[str, int]:
         The requested amino acid's position in the sequence.
 
     """
-    # Get amino acid identifier information from the reference module
-    aa_identifiers = qa.reference.get_aa_identifiers()
-    # Check if one or three letter code provided by counting letters
-    letter_count = sum(map(str.isalpha, res))
-
-    if letter_count == 1:
-        aa_name = res[0].upper().strip()  # clean the input
-        aa_num = int(res[1:])
-
-    if letter_count == 3 or res[:3] == "Hm1":
-        aa_name = res[:3].upper().strip()  # clean the input
+    # The Hm1 heme residue is the only name with a digit
+    if res[:3] == "Hm1":
+        aa_name = "HM1"
         aa_num = int(res[3:])
 
+    else:
+        # Split the one or three letter code from the number in a single pass
+        match = _RES_RE.fullmatch(res.strip())
+        if match is None:
+            raise ValueError(f"> ERROR: {res} is not a valid resname e.g., Ala1 or A1.")
+        aa_name = match.group(1).upper()
+        aa_num = int(match.group(2))
+
+        # One letter codes only exist for amino acids
+        if len(aa_name) == 1 and aa_name not in _AA_ONE:
+            raise ValueError(f"> ERROR: {aa_name} is not a one letter amino acid code.")
+        # Three letter names may also be ligands, so only let the user know
+        if len(aa_name) == 3 and aa_name not in _AA_THREE:
+            print(f"> {aa_name} is not a standard amino acid, treating it as a ligand.")
+
     print(f"> Reqesting amino acid {aa_name} at index {aa_num}.")
 
     return aa_name, aa_num
@@ -933,14 +1373,11 @@ def get_res_atom_indices(res, scheme="all") -> List[int]:
     pdb = get_pdb()
     # Check if the requested resname is valid
     aa_name, aa_num = check_valid_resname(res)
-    # Convert the pdb to a pandas dataframe
-    ppdb = PandasPdb().read_pdb(pdb).df["ATOM"]
+    # Load the cached atom columns of the pdb
+    atoms = _load_pdb_atoms(*_file_key(pdb))
 
     # Indices for all residues or for just the backbone
-    residue_df = ppdb[
-        (ppdb["residue_name"] == aa_name) & (ppdb["residue_number"] == aa_num)
-    ]
-    atom_index_list = residue_df.index.tolist()
+    in_residue = (atoms["residue_name"] == aa_name) & (atoms["residue_number"] == aa_num)
 
     # Use if you only want the backbone atoms summed
     if scheme == "backbone":
@@ -948,8 +1385,9 @@ def get_res_atom_indices(res, scheme="all") -> List[int]:
             "> Retrieving only backbone indices. See qa.process.get_res_atom_indices()"
         )
         bb_atoms = ["N", "H", "C", "O"]
-        backbone_df = residue_df[residue_df["atom_name"].isin(bb_atoms)]
-        atom_index_list = backbone_df.index.tolist()
+        in_residue &= np.isin(atoms["atom_name"], bb_atoms)
+
+    atom_index_list = np.flatnonzero(in_residue).tolist()
 
     if scheme != "all" and scheme != "backbone":
         raise ValueError("> ERROR: Scheme not recognized. Select all or backbone.")
@@ -961,7 +1399,94 @@ def get_res_atom_indices(res, scheme="all") -> List[int]:
     return atom_index_list
 
 
-def clean_qm_jobs(first_job: int, last_job: int, step: int) -> None:
+def _read_last_line(file_name, block_size=4096) -> bytes:
+    """
+    Reads the last non-empty line of a file without reading the whole file.
+
+    Blocks are read backwards from the end with os.pread,
+    so a log is usually checked with a single 4 KiB read.
+
+    Parameters
+    ----------
+    file_name: str
+        The path of the file.
+    block_size: int
+        The number of bytes read from the end at a time.
+
+    Returns
+    -------
+    last_line: bytes
+        The last line with surrounding whitespace removed.
+
+    """
+    fd = os.open(file_name, os.O_RDONLY)
+    try:
+        offset = os.fstat(fd).st_size
+        tail = b""
+        while offset > 0:
+            start = max(0, offset - block_size)
+            tail = os.pread(fd, offset - start, start) + tail
+            offset = start
+            # Stop once a complete line is in the tail
+            if b"\n" in tail.rstrip():
+                break
+    finally:
+        os.close(fd)
+
+    return tail.rstrip().rsplit(b"\n", 1)[-1].strip()
+
+
+def _check_qm_job(job_dir) -> Tuple[str, List[os.DirEntry]]:
+    """
+    Checks whether a single QM job finished from the tail of its log.
+
+    Parameters
+    ----------
+    job_dir: str
+        The absolute path of the QM job directory.
+
+    Returns
+    -------
+    status: str
+        missing if there is no .out file, otherwise incomplete or finished.
+    sorted_scr_dirs: List[os.DirEntry]
+        The scr directories of the job sorted from newest to oldest.
+
+    """
+    # Find the out files and scr directories in a single directory read
+    out_name = []
+    scr_dirs = []
+    with os.scandir(job_dir) as entries:
+        for entry in entries:
+            if entry.name.startswith("."):
+                continue
+            if entry.name.endswith(".out"):
+                out_name.append(entry.path)
+            elif entry.name.startswith("scr") and entry.is_dir():
+                scr_dirs.append(entry)
+
+    if len(out_name) < 1:
+        return "missing", scr_dirs
+
+    # Determine if a job finished from the tail of the log
+    last_line = _read_last_line(out_name[0])
+
+    # The phrase Job finished is indicative of a success
+    if b"Job finished" not in last_line:
+        return "incomplete", scr_dirs
+
+    # Sort the scr directories by age (oldest to newest)
+    # The DirEntry caches its stat so each is only stat'ed once
+    sorted_scr_dirs = sorted(
+        scr_dirs, key=lambda e: e.stat().st_mtime_ns, reverse=True
+    )
+
+    return "finished", sorted_scr_dirs
+
+
+def clean_qm_jobs(
+    first_job: int, last_job: int, step: int, verbose: bool = False
+) -> None:
     """
     Cleans all QM jobs and checks for completion.
 
@@ -980,56 +1505,51 @@ def clean_qm_jobs(first_job: int, last_job: int, step: int) -> None:
         The name of the last directory and last job e.g., 39900
     step: int
         The step size between each single point.
+    verbose: bool
+        Also report the jobs that finished successfully.
     """
     start_time = time.time()  # Used to report the executation speed
 
     # Directory containing all replicates
     primary_dir = os.getcwd()
-    replicates = sorted(glob.glob("*/"))
+    replicates = _list_replicates()
     total_job_count = 0  # Report to user upon job completion
     incomplete_job_count = 0  # Report to user upon job completion
 
-    for replicate in replicates:
-        os.chdir(replicate)
-        # The location of the current replicate
-        secondary_dir = os.getcwd()
-        print(f"> Checking {secondary_dir}.")
-
-        # A list of all job directories assuming they are named as integers
-        job_dirs = [str(dir) for dir in range(first_job, last_job, step)]
-        for dir in job_dirs:
-            total_job_count += 1
-            os.chdir(dir)
-            tertiary_dir = os.getcwd()
-
-            # Get the out file, we use glob so we can generalize to all out files
-            out_name = glob.glob("*.out")
-            if len(out_name) < 1:
-                print(f"   > Job in {tertiary_dir} did not finish.")
-            else:
-                # Determine if a job finished
-                with open(out_name[0], "r") as out_file:
-                    lines = out_file.read().rstrip().splitlines()
-                    last_line = lines[-1]
-                    # The phrase Job finished is indicative of a success
-                    if "Job finished" not in last_line:
-                        incomplete_job_count += 1
-                        print(f"   > Job in {tertiary_dir} did not finish.")
-
-                    # The job completed, so delete extra scr directories
-                    else:
-                        scr_dirs = glob.glob("scr*/")
-                        # Sort the scr directories by age (oldest to newest)
-                        sorted_scr_dirs = sorted(
-                            scr_dirs, key=os.path.getmtime, reverse=True
-                        )
-                        # Only keep the newest
-                        # for scr_dir in sorted_scr_dirs[1:]:
-                        #     shutil.rmtree(scr_dir)
-                        #     print(f"   > Delete extra scratch directory: {scr_dir}")
-
-            os.chdir(secondary_dir)
-        os.chdir(primary_dir)
+    # All job directories assuming they are named as integers
+    # They are the same in every replicate so only build them once
+    job_dirs = tuple(str(dir) for dir in range(first_job, last_job, step))
+
+    # The checks are dominated by file system calls, so run them in threads
+    with concurrent.futures.ThreadPoolExecutor(max_workers=64) as executor:
+        for replicate in replicates:
+            # The location of the current replicate
+            secondary_dir = os.path.join(primary_dir, replicate)
+            print(f"> Checking {secondary_dir}.")
+            messages = []  # Reported once the replicate has been checked
+
+            tertiary_dirs = [os.path.join(secondary_dir, dir) for dir in job_dirs]
+            results = executor.map(_check_qm_job, tertiary_dirs)
+            for tertiary_dir, (status, sorted_scr_dirs) in zip(tertiary_dirs, results):
+                total_job_count += 1
+                if status == "missing":
+                    messages.append(f"   > Job in {tertiary_dir} did not finish.")
+                elif status == "incomplete":
+                    incomplete_job_count += 1
+                    messages.append(f"   > Job in {tertiary_dir} did not finish.")
+
+                # The job completed, so delete extra scr directories
+                else:
+                    if verbose:
+                        messages.append(f"   > Job in {tertiary_dir} finished.")
+                    # Only keep the newest
+                    # for scr_dir in sorted_scr_dirs[1:]:
+                    #     shutil.rmtree(scr_dir.path)
+                    #     messages.append(f"   > Delete extra scratch directory: {scr_dir.path}")
+
+            # Write the replicate's report at once instead of a print per job
+            if messages:
+                sys.stdout.write("\n".join(messages) + "\n")
 
     total_time = round(time.time() - start_time, 3)  # Seconds to run the function
     print(
@@ -1043,7 +1563,132 @@ def clean_qm_jobs(first_job: int, last_job: int, step: int) -> None:
     )
 
 
-def combine_qm_charges(first_job: int, last_job: int, step: int) -> None:
+def _read_charge_pairs(replicate_dir, job) -> List[List[bytes]]:
+    """
+    Reads the atom and charge fields of a QM single point charge file.
+
+    Parameters
+    ----------
+    replicate_dir: str
+        The absolute path of the replicate directory.
+    job: int
+        The name of the job directory.
+
+    Returns
+    -------
+    split_pairs: List[List[bytes]]
+        The atom and charge fields of every line in charge_mull.xls.
+
+    """
+    charge_path = os.path.join(replicate_dir, str(job), "scr", "charge_mull.xls")
+
+    # Read the small charge file at once and split it into fields
+    with open(charge_path, "rb") as charges_file:
+        lines = charges_file.read().strip().split(b"\n")
+
+    return [line.strip().split(b"\t") for line in lines]
+
+
+def _combine_one(
+    replicate_dir, first_job, last_job, step, replicate_files=True, master=False
+) -> Tuple[int, str, bytes]:
+    """
+    Combines the charge_mull.xls files of a single replicate.
+
+    Parameters
+    ----------
+    replicate_dir: str
+        The absolute path of the replicate directory.
+    first_job: int
+        The name of the first directory and first job e.g., 0
+    last_job: int
+        The name of the last directory and last job e.g., 39901
+    step: int
+        The step size between each single point.
+    replicate_files: bool
+        Whether to write all_charges.xls in the replicate directory.
+    master: bool
+        Whether to also return the rows tagged for the master charge file.
+
+    Returns
+    -------
+    frames: int
+        The number of frames combined.
+    atom_line: str
+        The reindexed header line with the atom numbers and names.
+    master_rows: bytes
+        The charge lines without nan values, tagged with the replicate.
+
+    """
+    new_charge_file = os.path.join(replicate_dir, "all_charges.xls")
+    replicate_number = os.path.basename(os.path.normpath(replicate_dir))
+    tag = b"\t" + replicate_number.encode() + b"\n"
+    frames = 0  # Saved to report to the user
+    atom_line = None  # We need the title line but only once
+    master_rows = []
+
+    # Only replace the old replicate file when a new one will be written
+    if replicate_files and os.path.exists(new_charge_file):
+        os.remove(new_charge_file)  # Since appending remove old version
+        print(f"      > Deleting old {new_charge_file}.")
+    # All job directories assuming they are named as integers
+    job_dirs = range(first_job, last_job, step)
+    with contextlib.ExitStack() as stack:
+        # Nothing is written to the replicate when replicate_files is False
+        combined_charges_file = None
+        if replicate_files:
+            combined_charges_file = stack.enter_context(open(new_charge_file, "ab"))
+        # The first job also provides the header line so handle it up front
+        if job_dirs:
+            split_pairs = _read_charge_pairs(replicate_dir, job_dirs[0])
+            charge_line = b"\t".join([pair[1] for pair in split_pairs])
+
+            # For some reason, TeraChem indexes at 0 with SQM,
+            # and 1 with QM so we change the index to start at 1
+            atom_column = [pair[0] for pair in split_pairs]
+            atoms = pd.Series(atom_column).str.decode("utf-8")
+            atoms = atoms.str.split(n=1, expand=True)
+            atom_numbers = atoms[0].to_numpy(dtype=np.int64) - 1
+            atom_line = "\t".join(
+                np.char.add(
+                    np.char.add(atom_numbers.astype(str), " "),
+                    atoms[1].to_numpy(dtype=str),
+                )
+            )
+            if combined_charges_file is not None:
+                combined_charges_file.write(
+                    atom_line.encode() + b"\n" + charge_line + b"\n"
+                )
+            frames += 1
+
+            # Rows with nan values are left out of the master file
+            if master and b"nan" not in charge_line:
+                master_rows.append(charge_line + tag)
+
+        # The header has already been added for the remaining jobs
+        for index, dir in enumerate(job_dirs[1:], start=1):
+            split_pairs = _read_charge_pairs(replicate_dir, dir)
+            charge_line = b"\t".join([pair[1] for pair in split_pairs])
+
+            if b"nan" in charge_line:
+                print(f"      > Found nan values in {index * 100}!!")
+            # Rows with nan values are left out of the master file
+            elif master:
+                master_rows.append(charge_line + tag)
+            if combined_charges_file is not None:
+                combined_charges_file.write(charge_line + b"\n")
+            frames += 1
+
+    return frames, atom_line, b"".join(master_rows)
+
+
+def combine_qm_charges(
+    first_job: int,
+    last_job: int,
+    step: int,
+    master_path: str = None,
+    replicate_files: bool = True,
+) -> None:
     """
     Combines the charge_mull.xls files generate by TeraChem single points.
 
@@ -1060,83 +1705,66 @@ def combine_qm_charges(first_job: int, last_job: int, step: int) -> None:
         The name of the last directory and last job e.g., 39901
     step: int
         The step size between each single point.
+    master_path: str
+        Optional master charge file combining every replicate.
+        Rows are tagged with a trailing replicate column,
+        matching the output of combine_qm_replicates().
+    replicate_files: bool
+        Whether to also write all_charges.xls in each replicate.
 
     """
     start_time = time.time()  # Used to report the executation speed
     new_charge_file = "all_charges.xls"
-    current_charge_file = "charge_mull.xls"
-    ignore = ["Analysis/"]
+    ignore = ["Analysis"]
 
     # Directory containing all replicates
     primary_dir = os.getcwd()
-    directories = sorted(glob.glob("*/"))
-    replicates = [i for i in directories if i not in ignore]
+    replicates = _list_replicates(ignore)
     replicate_count = len(replicates)  # Report to user
-
-    for replicate in replicates:
-        frames = 0  # Saved to report to the user
-        os.chdir(replicate)
-        # The location of the current qm job that we are appending
-        secondary_dir = os.getcwd()
-        print(f"   > Adding { secondary_dir}")
-
-        # Create a new file where we will store the combined charges
-        first_charges_file = True  # We need the title line but only once
-
-        if os.path.exists(new_charge_file):
-            os.remove(new_charge_file)  # Since appending remove old version
-            print(f"      > Deleting old {secondary_dir}/{new_charge_file}.")
-        with open(new_charge_file, "a") as combined_charges_file:
-            # A list of all job directories assuming they are named as integers
-            job_dirs = [str(dir) for dir in range(first_job, last_job, step)]
-
-            # Change into one of the QM job directories
-            for index, dir in enumerate(job_dirs):
-                os.chdir(dir)
-                tertiary_dir = os.getcwd()
-                os.chdir("scr")
-                # Open an individual charge file from a QM single point
-                atom_column = []
-                charge_column = []
-
-                # Open one of the QM charge single point files
-                with open(current_charge_file, "r") as charges_file:
-                    # Separate the atom and charge information
-                    for line in charges_file:
-                        clean_line = line.strip().split("\t")
-                        charge_column.append(clean_line[1])
-                        atom_column.append(clean_line[0])
-
-                # Join the data and separate it with tabs
-                charge_line = "\t".join(charge_column)
-
-                # For some reason, TeraChem indexes at 0 with SQM,
-                # and 1 with QM so we change the index to start at 1
-                atoms_line_reindex = []
-                for atom in atom_column:
-                    atom_list = atom.split()
-                    atom_list[0] = str(int(atom_list[0]) - 1)
-                    x = " ".join(atom_list)
-                    atoms_line_reindex.append(x)
-                atom_line = "\t".join(atoms_line_reindex)
-
-                # Append the data to the combined charges data file
-                # We only add the header line once
-                if first_charges_file:
-                    combined_charges_file.write(f"{atom_line}\n")
-                    combined_charges_file.write(f"{charge_line}\n")
-                    frames += 1
-                    first_charges_file = False
-                # Skip the header if it has already been added
-                else:
-                    if "nan" in charge_line:
-                        print(f"      > Found nan values in {index * 100}!!")
-                    combined_charges_file.write(f"{charge_line}\n")
-                    frames += 1
-
-                os.chdir(secondary_dir)
-        print(f"      > Combined {frames} frames.")
-        os.chdir(primary_dir)
+    replicate_dirs = [os.path.join(primary_dir, replicate) for replicate in replicates]
+
+    # Write the master file on the fly instead of re-reading each replicate
+    with contextlib.ExitStack() as stack:
+        master_file = None
+        if master_path is not None:
+            master_path = os.path.abspath(master_path)
+            if os.path.exists(master_path):
+                os.remove(master_path)  # Since appending remove old version
+                print(f"      > Deleting old {master_path}.")
+
+            # A failed replicate should not leave a partial master file behind
+            def discard_master(exc_type, exc, traceback):
+                if exc_type is not None and os.path.exists(master_path):
+                    os.remove(master_path)
+
+            stack.push(discard_master)  # Runs after the file is closed
+            master_file = stack.enter_context(open(master_path, "ab"))
+        master_header_written = False
+
+        # Replicates write to separate files so combine them in parallel
+        workers = max(1, min(os.cpu_count() or 1, replicate_count))
+        executor = stack.enter_context(
+            concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+        )
+        results = executor.map(
+            _combine_one,
+            replicate_dirs,
+            repeat(first_job),
+            repeat(last_job),
+            repeat(step),
+            repeat(replicate_files),
+            repeat(master_file is not None),
+        )
+        for replicate_dir, (frames, atom_line, master_rows) in zip(
+            replicate_dirs, results
+        ):
+            print(f"   > Adding {replicate_dir}")
+            print(f"      > Combined {frames} frames.")
+            if master_file is not None:
+                if not master_header_written and atom_line is not None:
+                    master_file.write(f"{atom_line}\treplicate\n".encode())
+                    master_header_written = True
+                master_file.write(master_rows)
 
     total_time = round(time.time() - start_time, 3)  # Seconds to run the function
     print(
@@ -1161,12 +1789,11 @@ def combine_qm_replicates() -> None:
     """
     start_time = time.time()  # Used to report the executation speed
     charge_file = "all_charges.xls"
-    ignore = ["Analysis/"]
+    ignore = ["Analysis"]
 
     # Directory containing all replicates
     primary_dir = os.getcwd()
-    directories = sorted(glob.glob("*/"))
-    replicates = [i for i in directories if i not in ignore]
+    replicates = _list_replicates(ignore)
     replicate_count = len(replicates)  # Report to user
 
     # Remove any old version because we are appending
@@ -1175,31 +1802,37 @@ def combine_qm_replicates() -> None:
         print(f"      > Deleting old {charge_file}.")
 
     # Create a new file to save charges
-    with open(charge_file, "a") as new_charge_file:
+    with open(charge_file, "ab") as new_charge_file:
         header_written = False
         for replicate in replicates:
             # There will always be an Analysis folder
-            os.chdir(replicate)
-            secondary_dir = os.getcwd()
+            secondary_dir = os.path.join(primary_dir, replicate)
             print(f"   > Adding {secondary_dir}")
 
             # Get the replicate number from the folder name
-            replicate_number = os.path.basename(os.path.normpath(secondary_dir))
+            replicate_number = replicate
+
+            # Read the whole table and split off the header once
+            replicate_charge_file = os.path.join(secondary_dir, charge_file)
+            with open(replicate_charge_file, "rb") as current_charge_file:
+                header, _, body = current_charge_file.read().partition(b"\n")
 
             # Add the header for the first replicate
-            with open(charge_file, "r") as current_charge_file:
-                for index, line in enumerate(current_charge_file):
-                    if index == 0:
-                        if not header_written:
-                            new_charge_file.writelines(line.strip() + "\treplicate\n")
-                            header_written = True
-                        continue
-                    elif "nan" in line:
-                        print(f"      > Found nan values in {secondary_dir}.")
-                    else:
-                        new_charge_file.writelines(line.strip() + "\t" + replicate_number + "\n")
-
-            os.chdir(primary_dir)
+            if not header_written:
+                new_charge_file.write(header.strip() + b"\treplicate\n")
+                header_written = True
+
+            # Drop the rows with nan values
+            if b"nan" in body:
+                print(f"      > Found nan values in {secondary_dir}.")
+                rows = [row for row in body.splitlines() if b"nan" not in row]
+                body = b"\n".join(rows) + b"\n" if rows else b""
+            elif body and not body.endswith(b"\n"):
+                body += b"\n"
+
+            # Tag every row with the replicate in a single pass
+            tag = b"\t" + replicate_number.encode() + b"\n"
+            new_charge_file.write(body.replace(b"\n", tag))
 
     total_time = round(time.time() - start_time, 3)  # Seconds to run the function
     print(
@@ -1213,6 +1846,38 @@ def combine_qm_replicates() -> None:
     )
 
 
+def string_to_array(number_string: str) -> np.ndarray:
+    """
+    Converts a numerical string to an array of numbers.
+
+    Parameters
+    ----------
+    number_string: str
+        Comma separated numbers and dashed ranges e.g., "1-4,6,8-10"
+
+    Returns
+    -------
+    numbers: np.ndarray
+        The expanded numbers with the ranges inclusive of their end
+
+    Examples
+    --------
+    "1-4,6,8-10" -> array([1,2,3,4,6,8,9,10])
+
+    """
+    # Parse each segment once into its start and end
+    bounds = [segment.partition("-") for segment in number_string.split(",")]
+    starts = [int(start) for start, _, _ in bounds]
+    ends = [int(end) if dash else int(start) for start, dash, end in bounds]
+
+    # Expand every range at once
+    numbers = np.concatenate(
+        [np.arange(start, end + 1, dtype=np.int32) for start, end in zip(starts, ends)]
+    )
+
+    return numbers
+
+
 def string_to_list(str_list: List[str]) -> List[List[int]]:
     """
     Converts a list of numerical strings to a list of lists of numbers.
@@ -1224,25 +1889,11 @@ def string_to_list(str_list: List[str]) -> List[List[int]]:
     ["1-4,6,8-10", "1-3"] -> [[1,2,3,4,6,8,9,10],[1,2,3]]
 
     """
-    number_list = []
-    for number_string in str_list:
-        segments = number_string.split(",")
-
-        sub_list = []
-
-        for segment in segments:
-            if "-" in segment:
-                start, end = map(int, segment.split("-"))
-                sub_list.extend(range(start, end + 1))
-            else:
-                sub_list.append(int(segment))
-
-        number_list.append(sub_list)
+    number_list = [string_to_array(number_string).tolist() for number_string in str_list]
 
     return number_list
 
 
-
 def simple_xyz_combine():
     """
     Takes all xyz molecular structure files in the current directory
@@ -1259,7 +1910,7 @@ def simple_xyz_combine():
     xyz_files = glob.glob("*.xyz")
 
     # Sort the files based on the numerical part of the filename
-    xyz_files.sort(key=lambda x: int(os.path.splitext(x)[0]))
+    xyz_files.sort(key=lambda x: int(x.partition(".")[0]))
 
     # Create the output directory if it doesn't exist
     output_dir = "../Analysis/3_centroid"
@@ -1268,17 +1919,11 @@ def simple_xyz_combine():
     # Create the full output file path
     output_file_path = os.path.join(output_dir, "combined.xyz")
 
-    # Open the output file in write mode
-    with open(output_file_path, "w") as outfile:
-        # Loop through each file
+    # Open the output file in binary write mode, xyz files are plain ASCII
+    with open(output_file_path, "wb", buffering=1 << 20) as outfile:
+        # Stream each file into the output without reading it into memory
         for file in xyz_files:
-            # Open each file in read mode
-            with open(file, "r") as infile:
-                # Read the contents of the file
-                contents = infile.read()
-
-                # Write the contents to the output file
-                outfile.write(contents)
+            _append_file(file, outfile)
 
     print(f"   > All .xyz files have been combined into {output_file_path}")
 
@@ -3,11 +3,318 @@ Unit and regression test for the qa package.
 """
 
 # Import package, test suite, and other packages as needed
+import os
 import sys
 import pytest
+import numpy as np
+import pandas as pd
 import qa
+import qa.process
 
 
 def test_qa_imported():
     """Sample test, will always pass so long as import statement worked."""
     assert "qa" in sys.modules
+
+
+def _xyz_frame(frame, atoms=2):
+    """Builds one TeraChem style xyz frame with the given frame number."""
+    coords = "".join(f"H  {frame}.0 {index}.0 0.0\n" for index in range(atoms))
+    return f"{atoms}\nMD frame {frame} xyz file generated by terachem\n{coords}"
+
+
+@pytest.fixture
+def restart_runs(tmp_path, monkeypatch):
+    """Two restarted runs that overlap on frame 3, the last frame is truncated."""
+    run1 = tmp_path / "run1" / "scr.a"
+    run2 = tmp_path / "run2" / "scr.b"
+    run1.mkdir(parents=True)
+    run2.mkdir(parents=True)
+    header = "0 N\t1 H\n"
+    run1.joinpath("coors.xyz").write_text("".join(_xyz_frame(frame) for frame in (1, 2, 3)))
+    run1.joinpath("charge.xls").write_text(header + "0.1\t-0.1\n0.2\t-0.2\n0.3\t-0.3\n")
+    truncated = "2\nMD frame 5 xyz file generated by terachem\nH  5.0 0.0 0.0\n"
+    run2.joinpath("coors.xyz").write_text(_xyz_frame(3) + _xyz_frame(4) + truncated)
+    run2.joinpath("charge.xls").write_text(header + "9.3\t-9.3\n0.4\t-0.4\n0.5\t-0.5\n")
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_combine_restarts_skips_overlap(restart_runs):
+    """Overlapping frames are only taken from the first run."""
+    qa.process.combine_restarts(2)
+    coors = (restart_runs / "all_coors.xyz").read_text()
+    charges = (restart_runs / "all_charges.xls").read_text()
+    truncated = "2\nMD frame 5 xyz file generated by terachem\nH  5.0 0.0 0.0\n"
+    expected = "".join(_xyz_frame(frame) for frame in (1, 2, 3, 4)) + truncated
+    assert coors == expected
+    assert charges == "0 N\t1 H\n0.1\t-0.1\n0.2\t-0.2\n0.3\t-0.3\n0.4\t-0.4\n0.5\t-0.5\n"
+
+
+def test_combine_replicates_headers(tmp_path, monkeypatch):
+    """Only the first header is kept, whether later headers start with a digit or a letter."""
+    replicates = {
+        "1": "0 N\t1 H\n0.1\t-0.1\n",
+        "2": "Atom N\tAtom H\n0.2\t-0.2\n",
+        "3": "0.3\t-0.3\n0.4\t-0.4\n",
+    }
+    for name, charges in replicates.items():
+        replicate = tmp_path / name
+        replicate.mkdir()
+        replicate.joinpath("all_charges.xls").write_text(charges)
+        replicate.joinpath("all_coors.xyz").write_text(_xyz_frame(int(name)))
+    monkeypatch.chdir(tmp_path)
+    qa.process.combine_replicates()
+    charges = tmp_path.joinpath("all_charges.xls").read_text()
+    assert charges == "0 N\t1 H\n0.1\t-0.1\n0.2\t-0.2\n0.3\t-0.3\n0.4\t-0.4\n"
+    coors = tmp_path.joinpath("all_coors.xyz").read_text()
+    assert coors == _xyz_frame(1) + _xyz_frame(2) + _xyz_frame(3)
+
+
+def test_clean_incomplete_xyz(tmp_path, monkeypatch):
+    """An incomplete frame in the middle of the trajectory is removed."""
+    monkeypatch.chdir(tmp_path)
+    incomplete = "2\nMD frame 2 xyz file generated by terachem\nH  2.0 0.0 0.0\n"
+    tmp_path.joinpath("all_coors.xyz").write_text(
+        _xyz_frame(1) + incomplete + _xyz_frame(3) + _xyz_frame(4)
+    )
+    qa.process.clean_incomplete_xyz()
+    cleaned = tmp_path.joinpath("all_coors_clean.xyz").read_text()
+    assert cleaned == _xyz_frame(1) + _xyz_frame(3) + _xyz_frame(4)
+
+
+def test_clean_incomplete_xyz_empty(tmp_path, monkeypatch):
+    """An empty trajectory gives an empty cleaned trajectory."""
+    monkeypatch.chdir(tmp_path)
+    tmp_path.joinpath("all_coors.xyz").write_text("")
+    qa.process.clean_incomplete_xyz()
+    assert tmp_path.joinpath("all_coors_clean.xyz").read_text() == ""
+
+
+def test_get_pdb_first_usable(tmp_path, monkeypatch):
+    """The first template in name order that is not a trajectory is used."""
+    for name in ("a_traj", "b", "c"):
+        tmp_path.joinpath(name).mkdir()
+        tmp_path.joinpath(name, "template.pdb").write_text("END\n")
+    monkeypatch.chdir(tmp_path)
+    assert qa.process.get_pdb() == os.path.join(".", "b", "template.pdb")
+
+
+def test_get_pdb_skips_unreadable_directories(tmp_path, monkeypatch):
+    """Directories that cannot be listed are skipped instead of stopping the search."""
+    tmp_path.joinpath("a").mkdir()
+    tmp_path.joinpath("a", "template.pdb").write_text("END\n")
+    tmp_path.joinpath("b").mkdir()
+    scandir = os.scandir
+
+    def locked_scandir(path):
+        if os.path.basename(path) == "b":
+            raise PermissionError(path)
+        return scandir(path)
+
+    monkeypatch.setattr(os, "scandir", locked_scandir)
+    monkeypatch.chdir(tmp_path)
+    assert qa.process.get_pdb() == os.path.join(".", "a", "template.pdb")
+
+
+@pytest.mark.parametrize(
+    "res, expected",
+    [
+        ("Ala1", ("ALA", 1)),
+        ("G12", ("G", 12)),
+        ("gly12", ("GLY", 12)),
+        ("Hm15", ("HM1", 5)),
+        ("Lig7", ("LIG", 7)),
+    ],
+)
+def test_check_valid_resname(res, expected):
+    """Valid one and three letter names are split into a code and a number."""
+    assert qa.process.check_valid_resname(res) == expected
+
+
+@pytest.mark.parametrize("res", ["Al1", "Ala", "1Ala", "Ala1b"])
+def test_check_valid_resname_bad_format(res):
+    """Names that are not a one or three letter code and a number are rejected."""
+    with pytest.raises(ValueError, match="not a valid resname"):
+        qa.process.check_valid_resname(res)
+
+
+def test_check_valid_resname_bad_one_letter():
+    """One letter codes that are not amino acids are rejected."""
+    with pytest.raises(ValueError, match="not a one letter amino acid code"):
+        qa.process.check_valid_resname("B1")
+
+
+def _write_pdb(path, atoms):
+    """Writes a minimal PDB from (atom name, residue name, residue number) tuples."""
+    lines = [
+        f"ATOM  {index + 1:5d}  {name:<3s} {resname} A{resnum:4d}    "
+        f"{index:8.3f}{0:8.3f}{0:8.3f}  1.00  0.00           {name[0]}\n"
+        for index, (name, resname, resnum) in enumerate(atoms)
+    ]
+    path.write_text("".join(lines) + "END\n")
+
+
+@pytest.fixture
+def small_pdb(tmp_path, monkeypatch):
+    """A template PDB with three short residues."""
+    atoms = [
+        ("N", "MET", 1), ("CA", "MET", 1), ("CB", "MET", 1), ("C", "MET", 1),
+        ("N", "ALA", 2), ("H", "ALA", 2), ("CA", "ALA", 2), ("O", "ALA", 2),
+        ("N", "GLY", 3), ("CA", "GLY", 3),
+    ]
+    _write_pdb(tmp_path / "template.pdb", atoms)
+    monkeypatch.chdir(tmp_path)
+    return "template.pdb"
+
+
+def test_get_res_atom_indices(small_pdb):
+    """Atom indices are zero based and the backbone scheme filters them."""
+    assert qa.process.get_res_atom_indices("Ala2") == [4, 5, 6, 7]
+    assert qa.process.get_res_atom_indices("Met1", scheme="backbone") == [0, 3]
+    with pytest.raises(ValueError):
+        qa.process.get_res_atom_indices("Cys9")
+
+
+def test_get_residue_identifiers(small_pdb):
+    """Identifiers are given per atom or once per residue."""
+    identifiers = qa.process.get_residue_identifiers(small_pdb)
+    assert identifiers == ["MET1"] * 4 + ["ALA2"] * 4 + ["GLY3"] * 2
+    unique = qa.process.get_residue_identifiers(small_pdb, by_atom=False)
+    assert unique == ["MET1", "ALA2", "GLY3"]
+
+
+@pytest.fixture
+def qm_replicates(tmp_path, monkeypatch):
+    """Two replicates of two single points, one of which has nan charges."""
+    charges = {
+        ("1", 0): ["0.10", "-0.10"],
+        ("1", 100): ["nan", "nan"],
+        ("2", 0): ["0.30", "-0.30"],
+        ("2", 100): ["0.40", "-0.40"],
+    }
+    for (replicate, job), values in charges.items():
+        scr = tmp_path / replicate / str(job) / "scr"
+        scr.mkdir(parents=True)
+        lines = [
+            f"{index} {name}\t{value}\n" for index, name, value in zip((1, 2), "NH", values)
+        ]
+        scr.joinpath("charge_mull.xls").write_text("".join(lines))
+    tmp_path.joinpath("Analysis").mkdir()
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_combine_qm_charges_master_file(qm_replicates):
+    """The master file matches combine_qm_replicates without replicate files."""
+    qa.process.combine_qm_charges(0, 200, 100)
+    qa.process.combine_qm_replicates()
+    expected = qm_replicates.joinpath("all_charges.xls").read_text()
+    assert "nan" not in expected
+    for replicate in ("1", "2"):
+        qm_replicates.joinpath(replicate, "all_charges.xls").unlink()
+
+    qa.process.combine_qm_charges(0, 200, 100, master_path="master.xls", replicate_files=False)
+    assert qm_replicates.joinpath("master.xls").read_text() == expected
+    assert not qm_replicates.joinpath("1", "all_charges.xls").exists()
+
+
+def test_combine_qm_charges_failure_removes_master(qm_replicates):
+    """A missing single point does not leave a partial master file behind."""
+    qm_replicates.joinpath("2", "100", "scr", "charge_mull.xls").unlink()
+    with pytest.raises(FileNotFoundError):
+        qa.process.combine_qm_charges(0, 200, 100, master_path="master.xls")
+    assert not qm_replicates.joinpath("master.xls").exists()
+
+
+def _residue_charges(tmp_path, atoms):
+    """Charge data with one column per atom and two frames from different replicates."""
+    _write_pdb(tmp_path / "template.pdb", atoms)
+    charges = [[0.1 * (index + 1) for index in range(len(atoms))], [1.0] * len(atoms)]
+    charge_data = pd.DataFrame(charges, columns=[str(index) for index in range(len(atoms))])
+    charge_data["replicate"] = ["1", "2"]
+    return charge_data, str(tmp_path / "template.pdb")
+
+
+def test_summed_residue_charge(tmp_path):
+    """Contiguous residues are summed column wise and keep the replicate column."""
+    atoms = [("N", "MET", 1), ("CA", "MET", 1), ("N", "ALA", 2), ("CA", "ALA", 2), ("N", "GLY", 3)]
+    charge_data, template = _residue_charges(tmp_path, atoms)
+    summed = qa.process.summed_residue_charge(charge_data, template)
+    assert list(summed.columns) == ["MET1", "ALA2", "GLY3", "replicate"]
+    np.testing.assert_allclose(summed[["MET1", "ALA2", "GLY3"]], [[0.3, 0.7, 0.5], [2, 2, 1]])
+    assert summed["replicate"].tolist() == ["1", "2"]
+
+
+def test_summed_residue_charge_split_residue(tmp_path):
+    """A residue split across the PDB is still summed into a single column."""
+    atoms = [("N", "MET", 1), ("N", "ALA", 2), ("CA", "MET", 1)]
+    charge_data, template = _residue_charges(tmp_path, atoms)
+    summed = qa.process.summed_residue_charge(charge_data, template)
+    assert list(summed.columns) == ["MET1", "ALA2", "replicate"]
+    np.testing.assert_allclose(summed[["MET1", "ALA2"]], [[0.4, 0.2], [2, 1]])
+
+
+def test_summed_residue_charge_column_mismatch(tmp_path):
+    """Charge data that does not match the template atoms is rejected."""
+    charge_data, _ = _residue_charges(tmp_path, [("N", "MET", 1), ("CA", "MET", 1)])
+    _write_pdb(tmp_path / "template.pdb", [("N", "MET", 1)])
+    with pytest.raises(ValueError, match="charge columns"):
+        qa.process.summed_residue_charge(charge_data, str(tmp_path / "template.pdb"))
+
+
+@pytest.fixture
+def xyz_trajectory(tmp_path, monkeypatch):
+    """A two atom template with TER and END records and a two frame xyz trajectory."""
+    _write_pdb(tmp_path / "template.pdb", [("N", "MET", 1), ("CA", "MET", 1)])
+    template = tmp_path.joinpath("template.pdb").read_text().replace("END\n", "TER\nEND\n")
+    tmp_path.joinpath("template.pdb").write_text(template)
+    frames = [
+        [(1.23456, -10.5, 0.0), (2.0, 3.0, 4.0)],
+        [(100.0004, 0.25, -0.0625), (5.5, 6.5, 7.5)],
+    ]
+    tmp_path.joinpath("traj.xyz").write_text(
+        "".join(
+            f"2\nframe {index}\n" + "".join(f"N {x} {y} {z}\n" for x, y, z in frame)
+            for index, frame in enumerate(frames)
+        )
+    )
+    atom_lines = template.splitlines(keepends=True)[:2]
+    models = [
+        "".join(
+            f"{line[:30]}{x:8.3f}{y:8.3f}{z:8.3f}{line[54:]}"
+            for line, (x, y, z) in zip(atom_lines, frame)
+        )
+        for frame in frames
+    ]
+    monkeypatch.chdir(tmp_path)
+    return models
+
+
+def test_xyz2pdb_traj(xyz_trajectory):
+    """Each frame is written with %8.3f coordinates and ended by an END record."""
+    qa.process.xyz2pdb_traj("traj.xyz", "traj.pdb", "template.pdb")
+    with open("traj.pdb") as pdb:
+        assert pdb.read() == "".join(f"{model}END\n" for model in xyz_trajectory)
+
+
+def test_xyz2pdb_ensemble(xyz_trajectory):
+    """Every frame becomes a model and no empty model is left at the end."""
+    qa.process.xyz2pdb_ensemble()
+    expected = "TEMPLATE\n" + "".join(
+        f"MODEL        {number}\n{model}TER\nENDMDL\n"
+        for number, model in enumerate(xyz_trajectory, start=1)
+    )
+    with open("TEMPLATE_ensemble.pdb") as pdb:
+        assert pdb.read() == expected
+
+
+@pytest.mark.parametrize(
+    "number_string, expected",
+    [("1-4,6,8-10", [1, 2, 3, 4, 6, 8, 9, 10]), ("5", [5]), ("3-3,7-8", [3, 7, 8])],
+)
+def test_string_to_array(number_string, expected):
+    """Dashed ranges are expanded inclusive of their end."""
+    numbers = qa.process.string_to_array(number_string)
+    assert numbers.dtype == np.int32
+    assert numbers.tolist() == expected